@@ -0,0 +1,73 @@
+import argparse
+import contextlib
+import json
+import os
+from src.replay import SessionReplayer, extract_traces, format_report, load_traces, repeat_traces, save_traces
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay recorded coach sessions as production-shaped load.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extract = subparsers.add_parser("extract", help="Extract anonymized session traces to a JSON file.")
+    extract.add_argument("--logs-db", default="execution_logs.sqlite")
+    extract.add_argument("--memory-db", default="coach_memory.sqlite")
+    extract.add_argument("-o", "--output", default="session_traces.json")
+
+    run = subparsers.add_parser("run", help="Replay traces against the workflow and report load metrics.")
+    run.add_argument("--traces", help="Traces JSON file (extracted from the databases if omitted).")
+    run.add_argument("--logs-db", default="execution_logs.sqlite")
+    run.add_argument("--memory-db", default="coach_memory.sqlite")
+    run.add_argument("--concurrency", type=int, default=4, help="Sessions replayed in parallel.")
+    run.add_argument("--compression", type=float, default=1.0,
+                     help="Time compression for session arrivals and user think time (e.g. 60 = one minute per second).")
+    run.add_argument("--max-think-time", type=float, default=600.0,
+                     help="Cap in recorded seconds on the user think time between turns.")
+    run.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on the recorded LLM latencies.")
+    run.add_argument("--repeat", type=int, default=1, help="Replay the trace set this many times, one pass after another.")
+    run.add_argument("--db-path", default="replay_memory.sqlite", help="Checkpoint DB written during replay.")
+    run.add_argument("--log-db-path", default="replay_logs.sqlite", help="Execution log DB written during replay.")
+    run.add_argument("--json", dest="json_output", help="Also write the report to this JSON file.")
+    run.add_argument("--quiet", action="store_true", help="Suppress node output during replay.")
+    return parser.parse_args()
+
+
+def run_replay(args):
+    traces = load_traces(args.traces) if args.traces else extract_traces(args.logs_db, args.memory_db)
+    if not traces:
+        print("No session traces found.")
+        return
+    traces = repeat_traces(traces, args.repeat, args.max_think_time)
+
+    replayer = SessionReplayer(
+        traces,
+        concurrency=args.concurrency,
+        compression=args.compression,
+        latency_scale=args.latency_scale,
+        db_path=args.db_path,
+        log_db_path=args.log_db_path,
+        max_think_time=args.max_think_time,
+    )
+
+    print(f"--- Replaying {len(traces)} sessions (concurrency={args.concurrency}, compression={args.compression}x) ---")
+    if args.quiet:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            report = replayer.run()
+    else:
+        report = replayer.run()
+
+    print(format_report(report))
+    if args.json_output:
+        with open(args.json_output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to: {args.json_output}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "extract":
+        traces = extract_traces(args.logs_db, args.memory_db)
+        save_traces(traces, args.output)
+        print(f"Extracted {len(traces)} session traces to: {args.output}")
+    else:
+        run_replay(args)
@@ -9,8 +9,8 @@ from src.state import CoachState
 class CoachWorkflow:
     """Manages the graph construction, compiling and execution"""
 
-    def __init__(self, db_path="coach_memory.sqlite"):
-        self.nodes = CoachNodes()
+    def __init__(self, db_path="coach_memory.sqlite", llm=None):
+        self.nodes = CoachNodes(llm=llm)
         # Use SQLite for persistence
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
         self.memory = SqliteSaver(self.conn)
@@ -5,9 +5,9 @@ import os
 
 DB_PATH = "execution_logs.sqlite"
 
-def init_log_db():
+def init_log_db(db_path: str = DB_PATH):
     """Initialize the execution logs table."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS execution_logs (
@@ -23,9 +23,9 @@ def init_log_db():
     conn.commit()
     conn.close()
 
-def log_execution(session_id: str, node_name: str, start_time: float, end_time: float, outcome: any):
+def log_execution(session_id: str, node_name: str, start_time: float, end_time: float, outcome: any, db_path: str = DB_PATH):
     """Log a node execution event to the database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     duration = end_time - start_time
     
@@ -45,9 +45,9 @@ def log_execution(session_id: str, node_name: str, start_time: float, end_time:
     conn.commit()
     conn.close()
 
-def get_logs_for_session(session_id: str):
+def get_logs_for_session(session_id: str, db_path: str = DB_PATH):
     """Retrieve logs for a specific session."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     cursor.execute("""
         SELECT node_name, duration, outcome, start_time 
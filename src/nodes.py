@@ -15,8 +15,9 @@ class CoachNodes:
     """
     Encapsulates the logic for individual nodes in the AI Career Coach graph.
     """
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)
+    def __init__(self, llm=None):
+        # Any chat model exposing `invoke` can be injected (e.g. the replay stub)
+        self.llm = llm if llm is not None else ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)
 
     def node_profile_analyzer(self, state: CoachState) -> Dict[str, Any]:
         """
@@ -0,0 +1,554 @@
+import ast
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from src.graph import CoachWorkflow
+from src.logger import init_log_db, log_execution
+
+# Nodes that call the LLM, and the state field holding what they produced
+LLM_OUTPUT_FIELDS = {
+    "profile_analyzer": "raw_summary",
+    "gap_analyzer": "gap_analysis",
+    "plan_generator": "learning_plan",
+    "plan_refiner": "learning_plan",
+}
+DEFAULT_INPUT_SIZE = 200
+REVISE_FEEDBACK = "Please adjust the plan to fit my schedule better."
+APPROVE_FEEDBACK = "Approve"
+FILLER_TEXT = "lorem ipsum dolor sit amet "
+# A single- or double-quoted Python string literal, as it appears in a repr
+PY_STRING_LITERAL = r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*\""""
+
+
+@dataclass
+class NodeStep:
+    """A single recorded node execution (no content, only its shape)."""
+    node: str
+    duration: float
+    output_size: int = 0
+
+
+@dataclass
+class Turn:
+    """
+    One user interaction: a new message ("input") or feedback at the
+    human review breakpoint ("revise" / "approve").
+    """
+    kind: str
+    think_time: float
+    input_size: int = 0
+    steps: List[NodeStep] = field(default_factory=list)
+
+
+@dataclass
+class SessionTrace:
+    """
+    Anonymized shape of a recorded session. Sessions recorded on the same
+    thread share a `thread_group` and are replayed on one thread, in order.
+    """
+    session_id: str
+    start_offset: float
+    turns: List[Turn] = field(default_factory=list)
+    thread_group: Optional[str] = None
+
+    def duration(self, max_think_time: Optional[float] = None) -> float:
+        """Recorded time from the first node to the last, including (capped) think time."""
+        total = 0.0
+        for turn in self.turns:
+            think_time = turn.think_time if max_think_time is None else min(turn.think_time, max_think_time)
+            total += think_time + sum(step.duration for step in turn.steps)
+        return total
+
+    def llm_steps(self) -> List[NodeStep]:
+        return [step for turn in self.turns for step in turn.steps if step.node in LLM_OUTPUT_FIELDS]
+
+
+@dataclass
+class SessionResult:
+    """Measurements collected while replaying one session."""
+    session_id: str
+    turn_latencies: List[float] = field(default_factory=list)
+    node_latencies: Dict[str, List[float]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+# --- TRACE EXTRACTION ---
+
+def _parse_time(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _output_size(node_name: str, outcome: str) -> int:
+    """Measures the text a node produced from its logged outcome."""
+    field_name = LLM_OUTPUT_FIELDS.get(node_name)
+    if field_name is None or not outcome:
+        return 0
+
+    # Outcomes are JSON when serializable, otherwise the repr of the update dict
+    try:
+        data = json.loads(outcome)
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        value = data.get(field_name) or data.get("user_profile", {}).get(field_name)
+        if isinstance(value, str):
+            return len(value)
+
+    # In a repr, prefer the content of the last message, then the state field
+    literals = re.findall(r"\bcontent=(%s)" % PY_STRING_LITERAL, outcome)
+    if not literals:
+        literals = re.findall(r"'%s': (%s)" % (field_name, PY_STRING_LITERAL), outcome)
+    if literals:
+        try:
+            return len(ast.literal_eval(literals[-1]))
+        except (ValueError, SyntaxError):
+            pass
+    return 0
+
+
+def _connect_read_only(path: str) -> sqlite3.Connection:
+    """Opens an existing SQLite DB without being able to modify it."""
+    return sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+
+
+def _human_message_sizes(memory_db: str, thread_ids: List[str]) -> Dict[str, List[int]]:
+    """Reads the size of each user message per thread from the latest checkpoint."""
+    sizes = {}
+    if not memory_db or not os.path.exists(memory_db):
+        return sizes
+
+    serde = JsonPlusSerializer()
+    conn = _connect_read_only(memory_db)
+    try:
+        for thread_id in thread_ids:
+            row = conn.execute("""
+                SELECT type, checkpoint
+                FROM checkpoints
+                WHERE thread_id = ? AND checkpoint_ns = ''
+                ORDER BY checkpoint_id DESC
+                LIMIT 1
+            """, (thread_id,)).fetchone()
+            if row is None:
+                continue
+            checkpoint = serde.loads_typed((row[0], row[1]))
+            messages = checkpoint.get("channel_values", {}).get("messages", [])
+            sizes[thread_id] = [len(m.content) for m in messages if isinstance(m, HumanMessage)]
+    except sqlite3.OperationalError:
+        # Checkpoint tables might not exist yet
+        pass
+    finally:
+        conn.close()
+    return sizes
+
+
+def extract_traces(logs_db: str = "execution_logs.sqlite", memory_db: Optional[str] = "coach_memory.sqlite") -> List[SessionTrace]:
+    """
+    Builds anonymized session traces from `execution_logs`, enriched with the
+    user message sizes stored in the checkpoints. Only node names, timings and
+    sizes are kept; session ids are replaced and no content is retained.
+    """
+    if not os.path.exists(logs_db):
+        return []
+
+    conn = _connect_read_only(logs_db)
+    try:
+        rows = conn.execute("""
+            SELECT session_id, node_name, start_time, end_time, duration, outcome
+            FROM execution_logs
+            ORDER BY id ASC
+        """).fetchall()
+    except sqlite3.OperationalError:
+        # The logs table is only created once the app has run
+        return []
+    finally:
+        conn.close()
+
+    sessions: Dict[str, list] = {}
+    for row in rows:
+        sessions.setdefault(row[0], []).append(row)
+    if not sessions:
+        return []
+
+    input_sizes = _human_message_sizes(memory_db, list(sessions))
+
+    segments = []
+    for group_index, (session_id, session_rows) in enumerate(sessions.items(), 1):
+        thread_group = f"thread-{group_index:04d}"
+        recorded_inputs = deque(input_sizes.get(session_id, []))
+        turns: List[Turn] = []
+        segment_start = last_end = None
+        skipped_prefix = False
+        for _, node_name, start_time, end_time, duration, outcome in session_rows:
+            # Skip graph control events such as `__interrupt__`
+            if node_name.startswith("__"):
+                continue
+            start, end = _parse_time(start_time), _parse_time(end_time)
+
+            if node_name == "profile_analyzer":
+                # The CLI reuses one thread id for every run, so a fresh message
+                # after an approved plan starts a new session
+                if turns and turns[-1].kind == "approve":
+                    segments.append((segment_start, thread_group, turns))
+                    turns = []
+                if turns:
+                    think_time = max((start - last_end).total_seconds(), 0.0)
+                else:
+                    segment_start, think_time = start, 0.0
+                input_size = recorded_inputs.popleft() if recorded_inputs else DEFAULT_INPUT_SIZE
+                turns.append(Turn(kind="input", think_time=think_time, input_size=input_size))
+            elif not turns:
+                # Logs starting mid-session resume a plan that was never recorded,
+                # so drop them along with the user message that produced it
+                if not skipped_prefix and recorded_inputs:
+                    recorded_inputs.popleft()
+                skipped_prefix = True
+                continue
+            elif node_name == "human_review":
+                think_time = max((start - last_end).total_seconds(), 0.0)
+                turns.append(Turn(kind="approve", think_time=think_time))
+
+            if node_name == "plan_refiner":
+                turns[-1].kind = "revise"
+            turns[-1].steps.append(NodeStep(node_name, duration, _output_size(node_name, outcome)))
+            last_end = end
+
+        if turns:
+            segments.append((segment_start, thread_group, turns))
+
+    if not segments:
+        return []
+    segments.sort(key=lambda segment: segment[0])
+    first_start = segments[0][0]
+    return [
+        SessionTrace(f"session-{index:04d}", (start - first_start).total_seconds(), turns, thread_group)
+        for index, (start, thread_group, turns) in enumerate(segments, 1)
+    ]
+
+
+def save_traces(traces: List[SessionTrace], path: str):
+    """Writes traces to a JSON file that can be shared without exposing user data."""
+    with open(path, "w") as f:
+        json.dump([asdict(trace) for trace in traces], f, indent=2)
+
+
+def load_traces(path: str) -> List[SessionTrace]:
+    """Loads traces written by `save_traces`."""
+    with open(path) as f:
+        data = json.load(f)
+    traces = []
+    for item in data:
+        turns = [
+            Turn(
+                kind=t["kind"],
+                think_time=t["think_time"],
+                input_size=t.get("input_size", 0),
+                steps=[NodeStep(**s) for s in t["steps"]],
+            )
+            for t in item["turns"]
+        ]
+        traces.append(SessionTrace(item["session_id"], item["start_offset"], turns, item.get("thread_group")))
+    return traces
+
+
+def repeat_traces(traces: List[SessionTrace], times: int, max_think_time: Optional[float] = None) -> List[SessionTrace]:
+    """
+    Multiplies the recorded traffic by replaying the trace set `times` times
+    back to back, each pass keeping the recorded arrival pattern. Pass the
+    replay's think-time cap so passes are spaced by the replayed duration.
+    """
+    if times < 1:
+        raise ValueError("times must be at least 1")
+    if times == 1 or not traces:
+        return list(traces)
+
+    # Start each pass once the last replayed session of the previous one ended;
+    # sessions sharing a thread run back to back from the first one's arrival
+    span = max(
+        group[0].start_offset + sum(trace.duration(max_think_time) for trace in group)
+        for group in thread_groups(traces)
+    )
+
+    repeated = []
+    for k in range(times):
+        suffix = "" if k == 0 else f"-r{k + 1}"
+        for trace in traces:
+            thread_group = trace.thread_group + suffix if trace.thread_group else None
+            repeated.append(SessionTrace(trace.session_id + suffix, trace.start_offset + k * span, trace.turns, thread_group))
+    return repeated
+
+
+def thread_groups(traces: List[SessionTrace]) -> List[List[SessionTrace]]:
+    """Groups traces recorded on the same thread, each group in arrival order."""
+    groups: Dict[str, List[SessionTrace]] = {}
+    for trace in traces:
+        groups.setdefault(trace.thread_group or trace.session_id, []).append(trace)
+    return [sorted(group, key=lambda trace: trace.start_offset) for group in groups.values()]
+
+
+# --- STUB LLM ---
+
+class StubLLM:
+    """
+    Stands in for the chat model during replay. Each call sleeps for the
+    recorded latency of the next LLM node in the trace and returns a
+    message of the recorded output size.
+    """
+    def __init__(self, steps: List[NodeStep], latency_scale: float = 1.0):
+        self._steps = deque(steps)
+        self._last = steps[-1] if steps else NodeStep("", 0.0, 0)
+        self._lock = threading.Lock()
+        self.latency_scale = latency_scale
+
+    def invoke(self, messages):
+        with self._lock:
+            if self._steps:
+                self._last = self._steps.popleft()
+            step = self._last
+        time.sleep(step.duration * self.latency_scale)
+        return AIMessage(content=_filler(step.output_size))
+
+
+def _filler(size: int) -> str:
+    repeats = size // len(FILLER_TEXT) + 1
+    return (FILLER_TEXT * repeats)[:size]
+
+
+# --- LOAD GENERATION ---
+
+class SessionReplayer:
+    """
+    Re-drives session traces against the coach workflow in-process, with the
+    stub LLM standing in for Gemini.
+    """
+
+    def __init__(
+        self,
+        traces: List[SessionTrace],
+        concurrency: int = 4,
+        compression: float = 1.0,
+        latency_scale: float = 1.0,
+        db_path: str = "replay_memory.sqlite",
+        log_db_path: Optional[str] = "replay_logs.sqlite",
+        max_think_time: Optional[float] = 600.0,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if compression <= 0:
+            raise ValueError("compression must be positive")
+        self.traces = traces
+        self.concurrency = concurrency
+        self.compression = compression
+        self.latency_scale = latency_scale
+        self.db_path = db_path
+        self.log_db_path = log_db_path
+        self.max_think_time = max_think_time
+
+    def run(self) -> Dict[str, Any]:
+        """Replays all traces and returns the load report."""
+        # Create the checkpoint tables up front so sessions don't race on it
+        workflow = CoachWorkflow(db_path=self.db_path, llm=StubLLM([]))
+        workflow.memory.setup()
+        workflow.conn.close()
+        if self.log_db_path:
+            init_log_db(self.log_db_path)
+
+        stats_before = self._db_stats()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(self._replay_thread, group, start) for group in thread_groups(self.traces)]
+            results = [result for future in futures for result in future.result()]
+        wall_time = time.perf_counter() - start
+
+        return build_report(results, wall_time, stats_before, self._db_stats())
+
+    def _replay_thread(self, group: List[SessionTrace], start: float) -> List[SessionResult]:
+        """
+        Replays the sessions of one thread group on a single replay thread, so
+        checkpoints accumulate the message history as they did in production.
+        """
+        results = [SessionResult(trace.session_id) for trace in group]
+
+        # Keep the recorded arrival pattern, compressed in time. Later sessions
+        # on the thread follow straight on: the idle gap between runs is not
+        # think time and would only hold a worker.
+        delay = start + group[0].start_offset / self.compression - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        steps = [step for trace in group for step in trace.llm_steps()]
+        workflow = None
+        try:
+            workflow = CoachWorkflow(db_path=self.db_path, llm=StubLLM(steps, self.latency_scale))
+            thread_id = f"replay-{uuid.uuid4().hex[:8]}-{group[0].thread_group or group[0].session_id}"
+            for trace, result in zip(group, results):
+                try:
+                    self._drive_in_process(workflow.graph, thread_id, trace, result)
+                except Exception as e:
+                    result.error = f"{type(e).__name__}: {e}"
+        except Exception as e:
+            for result in results:
+                result.error = result.error or f"{type(e).__name__}: {e}"
+        finally:
+            if workflow is not None:
+                workflow.conn.close()
+        return results
+
+    def _drive_in_process(self, app, thread_id: str, trace: SessionTrace, result: SessionResult):
+        config = {"configurable": {"thread_id": thread_id}}
+        for turn in trace.turns:
+            self._think(turn)
+            if turn.kind == "input":
+                payload = {"messages": [HumanMessage(content=_filler(turn.input_size))]}
+            else:
+                app.update_state(config, {"human_feedback": _feedback(turn)})
+                payload = None
+
+            updates = (item for event in app.stream(payload, config) for item in event.items())
+            self._measure_turn(thread_id, updates, result)
+
+    def _think(self, turn: Turn):
+        """Waits for the (capped, compressed) time the user spent before this turn."""
+        think_time = turn.think_time
+        if self.max_think_time is not None:
+            think_time = min(think_time, self.max_think_time)
+        if think_time > 0:
+            time.sleep(think_time / self.compression)
+
+    def _measure_turn(self, session_id: str, updates, result: SessionResult):
+        """Times a turn and each node in it, logging like the CLI and UI do."""
+        turn_start = time.perf_counter()
+        step_start_time = time.time()
+        for node_name, state_update in updates:
+            step_end_time = time.time()
+            if not node_name.startswith("__"):
+                result.node_latencies.setdefault(node_name, []).append(step_end_time - step_start_time)
+            if self.log_db_path:
+                log_execution(
+                    session_id=session_id,
+                    node_name=node_name,
+                    start_time=step_start_time,
+                    end_time=step_end_time,
+                    outcome=state_update,
+                    db_path=self.log_db_path,
+                )
+            step_start_time = time.time()
+        result.turn_latencies.append(time.perf_counter() - turn_start)
+
+    def _db_stats(self) -> Dict[str, int]:
+        stats = {
+            "checkpoint_bytes": _file_size(self.db_path),
+            "checkpoint_rows": _count_rows(self.db_path, "checkpoints"),
+            "checkpoint_write_rows": _count_rows(self.db_path, "writes"),
+        }
+        if self.log_db_path:
+            stats["log_bytes"] = _file_size(self.log_db_path)
+            stats["log_rows"] = _count_rows(self.log_db_path, "execution_logs")
+        return stats
+
+
+def _feedback(turn: Turn) -> str:
+    return APPROVE_FEEDBACK if turn.kind == "approve" else REVISE_FEEDBACK
+
+
+def _file_size(path: str) -> int:
+    """Size of a SQLite DB including its write-ahead log."""
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def _count_rows(path: str, table: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+
+
+# --- REPORTING ---
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def build_report(results: List[SessionResult], wall_time: float, stats_before: Dict[str, int], stats_after: Dict[str, int]) -> Dict[str, Any]:
+    """Aggregates per-session measurements into throughput, latency and DB growth figures."""
+    completed = [r for r in results if r.error is None]
+    turn_latencies = [t for r in results for t in r.turn_latencies]
+    node_latencies: Dict[str, List[float]] = {}
+    for r in results:
+        for node_name, values in r.node_latencies.items():
+            node_latencies.setdefault(node_name, []).extend(values)
+
+    return {
+        "sessions": len(results),
+        "completed": len(completed),
+        "errors": [f"{r.session_id}: {r.error}" for r in results if r.error],
+        "wall_time": wall_time,
+        "sessions_per_sec": len(completed) / wall_time if wall_time else 0.0,
+        "turns_per_sec": len(turn_latencies) / wall_time if wall_time else 0.0,
+        "turn_latency": _latency_summary(turn_latencies),
+        "node_latency": {name: _latency_summary(values) for name, values in sorted(node_latencies.items())},
+        "db_growth": {key: stats_after.get(key, 0) - stats_before.get(key, 0) for key in stats_after},
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Renders a report as a plain-text table, in the style of the CLI log."""
+    lines = [
+        "=" * 70,
+        " REPLAY LOAD REPORT",
+        "=" * 70,
+        f"Sessions: {report['completed']}/{report['sessions']} completed in {report['wall_time']:.2f}s",
+        f"Throughput: {report['sessions_per_sec']:.2f} sessions/s, {report['turns_per_sec']:.2f} turns/s",
+        "-" * 70,
+        f"{'Latency (s)':<20} | {'Count':<6} | {'p50':<7} | {'p90':<7} | {'p95':<7} | {'p99':<7} | {'Max':<7}",
+        "-" * 70,
+    ]
+    rows = [("turn", report["turn_latency"])] + list(report["node_latency"].items())
+    for name, s in rows:
+        lines.append(
+            f"{name:<20} | {s['count']:<6} | {s['p50']:<7.3f} | {s['p90']:<7.3f} | "
+            f"{s['p95']:<7.3f} | {s['p99']:<7.3f} | {s['max']:<7.3f}"
+        )
+    lines.append("-" * 70)
+    for key, value in report["db_growth"].items():
+        lines.append(f"DB growth {key}: {value:+d}")
+    for error in report["errors"]:
+        lines.append(f"Error: {error}")
+    lines.append("=" * 70)
+    return "\n".join(lines)
@@ -0,0 +1,287 @@
+import sqlite3
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.graph import CoachWorkflow
+from src.logger import init_log_db, log_execution
+from src.replay import (
+    NodeStep,
+    SessionReplayer,
+    SessionTrace,
+    StubLLM,
+    Turn,
+    _output_size,
+    extract_traces,
+    load_traces,
+    percentile,
+    repeat_traces,
+    save_traces,
+)
+
+# Output sizes produced by the stub, in the order the LLM nodes are called
+PROFILE, GAP, PLAN, REFINED = 120, 150, 210, 180
+
+
+def _run_session(app, logs_db, thread_id, user_input, feedbacks, log_first_turn=True):
+    """Drives one session like main.py does, logging every node update."""
+    config = {"configurable": {"thread_id": thread_id}}
+
+    def process_stream(stream_generator, log=True):
+        step_start_time = time.time()
+        for event in stream_generator:
+            step_end_time = time.time()
+            for node_name, state_update in event.items():
+                if log:
+                    log_execution(thread_id, node_name, step_start_time, step_end_time, state_update, db_path=logs_db)
+            step_start_time = time.time()
+
+    process_stream(app.stream({"messages": [HumanMessage(content=user_input)]}, config), log=log_first_turn)
+    for feedback in feedbacks:
+        app.update_state(config, {"human_feedback": feedback})
+        process_stream(app.stream(None, config))
+
+
+def _workflow(memory_db, sizes):
+    steps = [NodeStep("stub", 0.0, size) for size in sizes]
+    return CoachWorkflow(db_path=str(memory_db), llm=StubLLM(steps))
+
+
+@pytest.fixture
+def recorded_dbs(tmp_path):
+    """Records a revised-then-approved session and an approved-at-once session."""
+    logs_db, memory_db = str(tmp_path / "logs.sqlite"), tmp_path / "memory.sqlite"
+    init_log_db(logs_db)
+
+    workflow = _workflow(memory_db, [PROFILE, GAP, PLAN, REFINED])
+    _run_session(workflow.graph, logs_db, "thread-a", "a" * 40, ["More Python please", "approve"])
+    workflow.conn.close()
+
+    workflow = _workflow(memory_db, [PROFILE, GAP, PLAN])
+    _run_session(workflow.graph, logs_db, "thread-b", "b" * 25, ["approve"])
+    workflow.conn.close()
+    return logs_db, str(memory_db)
+
+
+def _shape(trace):
+    return [(turn.kind, turn.input_size, [(step.node, step.output_size) for step in turn.steps]) for turn in trace.turns]
+
+
+def test_extract_traces_recovers_session_shapes(recorded_dbs):
+    traces = extract_traces(*recorded_dbs)
+
+    assert [trace.session_id for trace in traces] == ["session-0001", "session-0002"]
+    assert traces[0].thread_group != traces[1].thread_group
+    assert _shape(traces[0]) == [
+        ("input", 40, [("profile_analyzer", PROFILE), ("gap_analyzer", GAP), ("plan_generator", PLAN)]),
+        ("revise", 0, [("human_review", 0), ("plan_refiner", REFINED)]),
+        ("approve", 0, [("human_review", 0)]),
+    ]
+    assert _shape(traces[1]) == [
+        ("input", 25, [("profile_analyzer", PROFILE), ("gap_analyzer", GAP), ("plan_generator", PLAN)]),
+        ("approve", 0, [("human_review", 0)]),
+    ]
+    assert traces[1].start_offset > traces[0].start_offset
+
+
+def test_extract_traces_does_not_modify_databases(recorded_dbs, tmp_path):
+    logs_db, memory_db = recorded_dbs
+    plain_db = str(tmp_path / "plain.sqlite")
+    sqlite3.connect(plain_db).close()
+
+    assert extract_traces(logs_db, plain_db)
+    assert extract_traces(str(tmp_path / "missing.sqlite"), memory_db) == []
+    assert extract_traces(plain_db, memory_db) == []
+
+    assert not (tmp_path / "missing.sqlite").exists()
+    conn = sqlite3.connect(plain_db)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    conn.close()
+
+
+def test_extract_traces_handles_uri_characters_in_paths(tmp_path):
+    directory = tmp_path / "coach #1 ?50%"
+    directory.mkdir()
+    logs_db, memory_db = str(directory / "logs.sqlite"), directory / "memory.sqlite"
+    init_log_db(logs_db)
+    workflow = _workflow(memory_db, [PROFILE, GAP, PLAN])
+    _run_session(workflow.graph, logs_db, "thread-a", "a" * 40, ["approve"])
+    workflow.conn.close()
+
+    traces = extract_traces(logs_db, str(memory_db))
+
+    assert [(turn.kind, turn.input_size) for turn in traces[0].turns] == [("input", 40), ("approve", 0)]
+
+
+def test_extract_traces_splits_runs_on_a_reused_thread(tmp_path):
+    logs_db, memory_db = str(tmp_path / "logs.sqlite"), tmp_path / "memory.sqlite"
+    init_log_db(logs_db)
+    workflow = _workflow(memory_db, [PROFILE, GAP, PLAN])
+    _run_session(workflow.graph, logs_db, "cli_session_1", "a" * 30, ["approve"])
+    _run_session(workflow.graph, logs_db, "cli_session_1", "b" * 45, ["approve"])
+    workflow.conn.close()
+
+    traces = extract_traces(logs_db, str(memory_db))
+
+    assert [[(turn.kind, turn.input_size) for turn in trace.turns] for trace in traces] == [
+        [("input", 30), ("approve", 0)],
+        [("input", 45), ("approve", 0)],
+    ]
+    assert all(trace.turns[0].think_time == 0.0 for trace in traces)
+    assert traces[0].thread_group == traces[1].thread_group
+
+
+def test_replay_keeps_reused_thread_history(tmp_path):
+    logs_db, memory_db = str(tmp_path / "logs.sqlite"), str(tmp_path / "memory.sqlite")
+    init_log_db(logs_db)
+    workflow = _workflow(memory_db, [PROFILE, GAP, PLAN])
+    for user_input in ("a" * 30, "b" * 45, "c" * 60):
+        _run_session(workflow.graph, logs_db, "cli_session_1", user_input, ["approve"])
+    workflow.conn.close()
+    conn = sqlite3.connect(memory_db)
+    recorded_checkpoints = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+    conn.close()
+
+    replay_memory_db, replay_logs_db = str(tmp_path / "replay_memory.sqlite"), str(tmp_path / "replay_logs.sqlite")
+    replayer = SessionReplayer(
+        extract_traces(logs_db, memory_db),
+        concurrency=3,
+        compression=1000,
+        db_path=replay_memory_db,
+        log_db_path=replay_logs_db,
+    )
+    report = replayer.run()
+
+    assert report["errors"] == []
+    assert report["completed"] == 3
+    assert report["db_growth"]["checkpoint_rows"] == recorded_checkpoints
+    conn = sqlite3.connect(replay_logs_db)
+    (thread_id,), = conn.execute("SELECT DISTINCT session_id FROM execution_logs").fetchall()
+    conn.close()
+    workflow = CoachWorkflow(db_path=replay_memory_db, llm=StubLLM([]))
+    messages = workflow.graph.get_state({"configurable": {"thread_id": thread_id}}).values["messages"]
+    workflow.conn.close()
+    assert [len(m.content) for m in messages if isinstance(m, HumanMessage)] == [30, 45, 60]
+
+
+def test_extract_traces_skips_logs_starting_mid_session(tmp_path):
+    logs_db, memory_db = str(tmp_path / "logs.sqlite"), tmp_path / "memory.sqlite"
+    init_log_db(logs_db)
+    workflow = _workflow(memory_db, [PROFILE, GAP, PLAN, REFINED])
+    _run_session(workflow.graph, logs_db, "thread-a", "a" * 40, ["More Python please", "approve"], log_first_turn=False)
+    workflow.conn.close()
+
+    assert extract_traces(logs_db, str(memory_db)) == []
+
+
+def test_output_size_decodes_repr_literals():
+    text = "It's a plan:\n- learn \"SQL\" \\ today"
+    update = {"learning_plan": text, "messages": [AIMessage(content=text)], "revision_count": 0}
+
+    assert _output_size("plan_generator", str(update)) == len(text)
+    assert _output_size("plan_generator", str({"learning_plan": text})) == len(text)
+    assert _output_size("gap_analyzer", '{"gap_analysis": "%s"}' % ("x" * 12)) == 12
+    assert _output_size("human_review", str({"is_approved": True})) == 0
+
+
+def test_save_and_load_traces_round_trip(recorded_dbs, tmp_path):
+    traces = extract_traces(*recorded_dbs)
+    path = str(tmp_path / "traces.json")
+
+    save_traces(traces, path)
+
+    assert load_traces(path) == traces
+
+
+def test_repeat_traces_shifts_passes_and_renames_sessions():
+    turns = [Turn(kind="input", think_time=0.0, steps=[NodeStep("profile_analyzer", 2.0)])]
+    traces = [SessionTrace("session-0001", 0.0, turns), SessionTrace("session-0002", 3.0, turns)]
+
+    repeated = repeat_traces(traces, 3)
+
+    assert [(trace.session_id, trace.start_offset) for trace in repeated] == [
+        ("session-0001", 0.0),
+        ("session-0002", 3.0),
+        ("session-0001-r2", 5.0),
+        ("session-0002-r2", 8.0),
+        ("session-0001-r3", 10.0),
+        ("session-0002-r3", 13.0),
+    ]
+
+
+def test_repeat_traces_caps_long_think_gaps():
+    turns = [
+        Turn(kind="input", think_time=0.0, steps=[NodeStep("profile_analyzer", 2.0)]),
+        Turn(kind="approve", think_time=3 * 24 * 3600.0, steps=[NodeStep("human_review", 1.0)]),
+    ]
+    traces = [SessionTrace("session-0001", 0.0, turns), SessionTrace("session-0002", 60.0, turns)]
+
+    repeated = repeat_traces(traces, 2, max_think_time=600.0)
+
+    assert [trace.start_offset for trace in repeated] == [0.0, 60.0, 663.0, 723.0]
+
+
+def test_repeat_traces_runs_thread_groups_back_to_back():
+    turns = [Turn(kind="input", think_time=0.0, steps=[NodeStep("profile_analyzer", 2.0)])]
+    traces = [
+        SessionTrace("session-0001", 0.0, turns, "thread-0001"),
+        SessionTrace("session-0002", 86400.0, turns, "thread-0001"),
+    ]
+
+    repeated = repeat_traces(traces, 2)
+
+    assert [(trace.session_id, trace.start_offset, trace.thread_group) for trace in repeated] == [
+        ("session-0001", 0.0, "thread-0001"),
+        ("session-0002", 86400.0, "thread-0001"),
+        ("session-0001-r2", 4.0, "thread-0001-r2"),
+        ("session-0002-r2", 86404.0, "thread-0001-r2"),
+    ]
+
+
+def test_workflow_keeps_an_injected_falsy_llm(tmp_path):
+    class EmptyStubLLM(StubLLM):
+        def __len__(self):
+            return 0
+
+    llm = EmptyStubLLM([])
+    workflow = CoachWorkflow(db_path=str(tmp_path / "memory.sqlite"), llm=llm)
+    workflow.conn.close()
+
+    assert workflow.nodes.llm is llm
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 95) == 0.0
+
+
+def test_in_process_replay_completes(recorded_dbs, tmp_path):
+    traces = extract_traces(*recorded_dbs)
+    replayer = SessionReplayer(
+        traces,
+        concurrency=2,
+        compression=1000,
+        db_path=str(tmp_path / "replay_memory.sqlite"),
+        log_db_path=str(tmp_path / "replay_logs.sqlite"),
+    )
+
+    report = replayer.run()
+
+    assert report["errors"] == []
+    assert report["completed"] == 2
+    assert report["turn_latency"]["count"] == 5
+    assert {name: s["count"] for name, s in report["node_latency"].items()} == {
+        "profile_analyzer": 2,
+        "gap_analyzer": 2,
+        "plan_generator": 2,
+        "human_review": 3,
+        "plan_refiner": 1,
+    }
+    assert report["db_growth"]["checkpoint_rows"] > 0
+    assert report["db_growth"]["log_rows"] > 0